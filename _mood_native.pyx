@@ -0,0 +1,34 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+# distutils: define_macros=_GNU_SOURCE=1
+"""
+Native keyword scorer for MoodDetector
+Optional accelerator used when pyahocorasick is not installed
+
+Build in place with: cythonize -i _mood_native.pyx
+"""
+
+cdef extern from "string.h":
+    void *memmem(const void *haystack, size_t haystacklen,
+                 const void *needle, size_t needlelen) nogil
+
+
+def score(bytes text, bytes keywords, const int[:] offsets, const int[:] lengths,
+          const int[:] emotion_ids, const int[:] weights, int num_emotions):
+    """
+    Score text against a packed keyword table
+
+    Keyword i is keywords[offsets[i]:offsets[i] + lengths[i]]. If it occurs
+    anywhere in text, weights[i] is added to scores[emotion_ids[i]] (once).
+    Returns the list of per-emotion scores.
+    """
+    cdef const char *hay = text
+    cdef const char *kw = keywords
+    cdef size_t hay_len = len(text)
+    cdef Py_ssize_t i
+    scores = [0] * num_emotions
+
+    for i in range(offsets.shape[0]):
+        if memmem(hay, hay_len, kw + offsets[i], lengths[i]) != NULL:
+            scores[emotion_ids[i]] += weights[i]
+
+    return scores
@@ -3,10 +3,14 @@ Flask API Server for MoodTune
 Provides REST endpoints for mood detection and music recommendations
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
 from flask_cors import CORS
 from backend import MoodTuneAPI
+from logging.handlers import QueueHandler, QueueListener
+import atexit
 import logging
+import orjson
+import queue
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -16,29 +20,111 @@ CORS(app)  # Enable CORS for frontend integration
 moodtune = MoodTuneAPI()
 
 # Setup logging
-logging.basicConfig(level=logging.INFO)
+_log_handler = None
+_log_listener = None
+
+
+def configure_logging(level=logging.INFO):
+    """
+    Send log records through a queue whose background thread does the
+    stream writes, so request handlers never wait on the stream handler's
+    lock or I/O
+    
+    Like logging.basicConfig, this does nothing when the root logger
+    already has handlers from the host application or server. Gunicorn's
+    post_fork hook calls it again to replace the queue handler installed
+    before fork, because the listener thread does not survive fork.
+    """
+    global _log_handler, _log_listener
+    root = logging.getLogger()
+    if _log_listener is not None:
+        atexit.unregister(_log_listener.stop)
+        root.removeHandler(_log_handler)
+        _log_handler = _log_listener = None
+    
+    if root.handlers:
+        return
+    
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    
+    _log_handler = QueueHandler(log_queue)
+    root.addHandler(_log_handler)
+    root.setLevel(level)
+    
+    _log_listener = QueueListener(log_queue, stream_handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
+
+configure_logging()
 logger = logging.getLogger(__name__)
 
 
+def _json(obj, status=200):
+    """Build a JSON response serialized with orjson"""
+    return Response(orjson.dumps(obj), status=status, mimetype='application/json')
+
+
+# /analyze responses with more songs than this are streamed. The curated
+# database has 5 songs per mood, so only a larger catalogue reaches it;
+# test_api_server.py lowers it to cover the streaming path.
+_STREAM_MIN_SONGS = 10
+
+
+def _iter_json(obj):
+    """
+    Serialize a dict as JSON chunks: one per top-level field, with list
+    values emitted one element at a time
+    """
+    yield b'{'
+    for i, (key, value) in enumerate(obj.items()):
+        prefix = (b',' if i else b'') + orjson.dumps(key) + b':'
+        if isinstance(value, (list, tuple)):
+            yield prefix + b'['
+            for j, item in enumerate(value):
+                yield (b',' if j else b'') + orjson.dumps(item)
+            yield b']'
+        else:
+            yield prefix + orjson.dumps(value)
+    yield b'}'
+
+
+# Bodies of the static endpoints, serialized once at import.
+# The mood list is fixed once MusicRecommender is built.
+_HOME_BYTES = orjson.dumps({
+    'status': 'running',
+    'service': 'MoodTune API',
+    'version': '1.0.0',
+    'endpoints': {
+        '/analyze': 'POST - Analyze mood and get recommendations',
+        '/moods': 'GET - Get all available moods',
+        '/health': 'GET - Health check',
+        '/live': 'GET - Liveness probe (204, no body)',
+        '/cache/stats': 'GET - Analysis cache statistics'
+    }
+})
+_HEALTH_BYTES = orjson.dumps({'status': 'healthy'})
+_MOODS_BYTES = orjson.dumps({'moods': moodtune.recommender.get_all_moods()})
+
+
 @app.route('/', methods=['GET'])
 def home():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'running',
-        'service': 'MoodTune API',
-        'version': '1.0.0',
-        'endpoints': {
-            '/analyze': 'POST - Analyze mood and get recommendations',
-            '/moods': 'GET - Get all available moods',
-            '/health': 'GET - Health check'
-        }
-    })
+    return Response(_HOME_BYTES, status=200, mimetype='application/json')
 
 
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
-    return jsonify({'status': 'healthy'}), 200
+    return Response(_HEALTH_BYTES, status=200, mimetype='application/json')
+
+
+@app.route('/live', methods=['GET'])
+def live():
+    """Liveness probe for load balancers: empty 204, no JSON work"""
+    return '', 204
 
 
 @app.route('/analyze', methods=['POST'])
@@ -63,37 +149,46 @@ def analyze_mood():
     }
     """
     try:
-        data = request.get_json()
+        try:
+            data = orjson.loads(request.get_data())
+        except orjson.JSONDecodeError:
+            return _json({
+                'error': 'Request body must be valid JSON'
+            }, 400)
         
         # Validate request
         if not data or 'text' not in data:
-            return jsonify({
+            return _json({
                 'error': 'Missing required field: text'
-            }), 400
+            }, 400)
         
         user_text = data['text']
         num_songs = data.get('num_songs', 5)
         
         # Validate num_songs
         if not isinstance(num_songs, int) or num_songs < 1 or num_songs > 20:
-            return jsonify({
+            return _json({
                 'error': 'num_songs must be an integer between 1 and 20'
-            }), 400
+            }, 400)
         
         # Process request
-        logger.info(f"Analyzing mood for text: {user_text[:50]}...")
+        logger.debug("Analyzing mood for text: %.50s...", user_text)
         result = moodtune.analyze_and_recommend(user_text, num_songs)
         
-        logger.info(f"Detected mood: {result['detected_mood']} (confidence: {result['confidence']})")
+        logger.debug("Detected mood: %s (confidence: %s)", result['detected_mood'], result['confidence'])
         
-        return jsonify(result), 200
+        # Large responses start sending before the whole body is serialized
+        if len(result['recommendations']) > _STREAM_MIN_SONGS:
+            return Response(_iter_json(result), status=200, mimetype='application/json')
+        
+        return _json(result, 200)
         
     except Exception as e:
         logger.error(f"Error processing request: {str(e)}")
-        return jsonify({
+        return _json({
             'error': 'Internal server error',
             'message': str(e)
-        }), 500
+        }, 500)
 
 
 @app.route('/moods', methods=['GET'])
@@ -106,16 +201,7 @@ def get_moods():
         "moods": ["happy", "sad", "energetic", ...]
     }
     """
-    try:
-        moods = moodtune.recommender.get_all_moods()
-        return jsonify({'moods': moods}), 200
-        
-    except Exception as e:
-        logger.error(f"Error getting moods: {str(e)}")
-        return jsonify({
-            'error': 'Internal server error',
-            'message': str(e)
-        }), 500
+    return Response(_MOODS_BYTES, status=200, mimetype='application/json')
 
 
 @app.route('/recommend/<mood>', methods=['GET'])
@@ -137,48 +223,59 @@ def recommend_by_mood(mood):
         
         # Validate num_songs
         if num_songs < 1 or num_songs > 20:
-            return jsonify({
+            return _json({
                 'error': 'num_songs must be between 1 and 20'
-            }), 400
+            }, 400)
         
         # Check if mood exists
         available_moods = moodtune.recommender.get_all_moods()
         if mood not in available_moods:
-            return jsonify({
+            return _json({
                 'error': f'Invalid mood. Available moods: {", ".join(available_moods)}'
-            }), 400
+            }, 400)
         
-        recommendations = moodtune.recommender.get_recommendations(mood, num_songs)
+        # Response bodies are serialized once when the recommender is built
+        body = moodtune.recommender.get_recommendations_bytes(mood, num_songs)
         
-        return jsonify({
-            'mood': mood,
-            'recommendations': recommendations
-        }), 200
+        return Response(body, status=200, mimetype='application/json')
         
     except Exception as e:
         logger.error(f"Error getting recommendations: {str(e)}")
-        return jsonify({
+        return _json({
             'error': 'Internal server error',
             'message': str(e)
-        }), 500
+        }, 500)
+
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """
+    Get hit/miss statistics for the /analyze result cache
+    
+    Response:
+    {
+        "cache": {"hits": 10, "misses": 3, "maxsize": 2048, "currsize": 3}
+    }
+    """
+    return _json({'cache': moodtune.cache_info()}, 200)
 
 
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors"""
-    return jsonify({
+    return _json({
         'error': 'Not found',
         'message': 'The requested endpoint does not exist'
-    }), 404
+    }, 404)
 
 
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
-    return jsonify({
+    return _json({
         'error': 'Internal server error',
         'message': 'An unexpected error occurred'
-    }), 500
+    }, 500)
 
 
 if __name__ == '__main__':
@@ -188,15 +285,16 @@ if __name__ == '__main__':
     print("\nAvailable endpoints:")
     print("  GET  /              - API information")
     print("  GET  /health        - Health check")
+    print("  GET  /live          - Liveness probe (204)")
     print("  POST /analyze       - Analyze mood and get recommendations")
     print("  GET  /moods         - Get all available moods")
     print("  GET  /recommend/<mood> - Get recommendations for specific mood")
+    print("  GET  /cache/stats   - Analysis cache statistics")
     print("\n" + "=" * 80)
     print()
     
-    # Run the Flask app
+    # Development server only; use gunicorn -c gunicorn.conf.py wsgi:app in production
     app.run(
         host='0.0.0.0',
-        port=5001,
-        debug=True
+        port=5001
     )
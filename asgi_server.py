@@ -0,0 +1,155 @@
+"""
+ASGI API Server for MoodTune
+FastAPI port of api_server.py, served by uvicorn with uvloop and httptools
+
+Run with: uvicorn asgi_server:app --workers 4 --loop uvloop --http httptools
+"""
+
+from typing import Optional
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from backend import MoodTuneAPI
+import logging
+import orjson
+
+# Initialize FastAPI app
+app = FastAPI(title='MoodTune API', version='1.0.0', default_response_class=ORJSONResponse)
+app.add_middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])
+
+# Initialize MoodTune API
+moodtune = MoodTuneAPI()
+
+logger = logging.getLogger(__name__)
+
+
+# Bodies of the static endpoints, serialized once at import
+_HOME_BYTES = orjson.dumps({
+    'status': 'running',
+    'service': 'MoodTune API',
+    'version': '1.0.0',
+    'endpoints': {
+        '/analyze': 'POST - Analyze mood and get recommendations',
+        '/moods': 'GET - Get all available moods',
+        '/health': 'GET - Health check',
+        '/live': 'GET - Liveness probe (204, no body)',
+        '/cache/stats': 'GET - Analysis cache statistics'
+    }
+})
+_HEALTH_BYTES = orjson.dumps({'status': 'healthy'})
+_MOODS_BYTES = orjson.dumps({'moods': moodtune.recommender.get_all_moods()})
+
+
+def _raw_json(body: bytes, status: int = 200) -> Response:
+    """Wrap an already serialized JSON body"""
+    return Response(content=body, status_code=status, media_type='application/json')
+
+
+def _query_int(value: Optional[str], default: int) -> int:
+    """Parse an int query param like Flask's args.get(type=int): bad values give the default"""
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+@app.get('/')
+async def home():
+    """Health check endpoint"""
+    return _raw_json(_HOME_BYTES)
+
+
+@app.get('/health')
+async def health():
+    """Health check endpoint"""
+    return _raw_json(_HEALTH_BYTES)
+
+
+@app.get('/live')
+async def live():
+    """Liveness probe for load balancers: empty 204, no JSON work"""
+    return Response(status_code=204)
+
+
+@app.post('/analyze')
+async def analyze_mood(request: Request):
+    """
+    Analyze user mood and return song recommendations
+    The body is parsed and checked exactly like the Flask POST /analyze,
+    whatever the Content-Type, so both servers give the same errors
+    """
+    try:
+        try:
+            data = orjson.loads(await request.body())
+        except orjson.JSONDecodeError:
+            return ORJSONResponse({
+                'error': 'Request body must be valid JSON'
+            }, status_code=400)
+
+        if not data or 'text' not in data:
+            return ORJSONResponse({
+                'error': 'Missing required field: text'
+            }, status_code=400)
+
+        user_text = data['text']
+        num_songs = data.get('num_songs', 5)
+
+        if not isinstance(num_songs, int) or num_songs < 1 or num_songs > 20:
+            return ORJSONResponse({
+                'error': 'num_songs must be an integer between 1 and 20'
+            }, status_code=400)
+
+        # A Response passes straight through; a plain dict would first go
+        # through jsonable_encoder, a Python pass over every song
+        return ORJSONResponse(moodtune.analyze_and_recommend(user_text, num_songs))
+
+    except Exception as e:
+        logger.error("Error processing request: %s", e)
+        return ORJSONResponse({
+            'error': 'Internal server error',
+            'message': str(e)
+        }, status_code=500)
+
+
+@app.get('/moods')
+async def get_moods():
+    """Get list of all available moods"""
+    return _raw_json(_MOODS_BYTES)
+
+
+@app.get('/recommend/{mood}')
+async def recommend_by_mood(mood: str, num_songs: Optional[str] = None):
+    """Get recommendations for a specific mood"""
+    num_songs = _query_int(num_songs, 5)
+    if num_songs < 1 or num_songs > 20:
+        return ORJSONResponse({
+            'error': 'num_songs must be between 1 and 20'
+        }, status_code=400)
+
+    available_moods = moodtune.recommender.get_all_moods()
+    if mood not in available_moods:
+        return ORJSONResponse({
+            'error': f'Invalid mood. Available moods: {", ".join(available_moods)}'
+        }, status_code=400)
+
+    return _raw_json(moodtune.recommender.get_recommendations_bytes(mood, num_songs))
+
+
+@app.get('/cache/stats')
+async def cache_stats():
+    """Get hit/miss statistics for the /analyze result cache"""
+    return ORJSONResponse({'cache': moodtune.cache_info()})
+
+
+@app.exception_handler(StarletteHTTPException)
+async def http_error(request: Request, exc: StarletteHTTPException):
+    """Match the Flask server's 404 body"""
+    if exc.status_code == 404:
+        return ORJSONResponse({
+            'error': 'Not found',
+            'message': 'The requested endpoint does not exist'
+        }, status_code=404)
+    return ORJSONResponse({'error': exc.detail}, status_code=exc.status_code)
@@ -3,9 +3,111 @@ MoodTune Backend - Advanced Mood Detection and Music Recommendation System
 Uses HuggingFace transformers for emotion classification
 """
 
-from typing import List, Dict, Optional
+from typing import Final, List, Dict, Optional, Tuple
+import array
+import functools
 import json
 import re
+import string
+import sys
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import _mood_native
+except ImportError:
+    _mood_native = None
+
+
+# Maps ASCII punctuation to spaces; the fast path for ASCII-only text
+_PUNCT_TABLE: Final = str.maketrans({c: ' ' for c in string.punctuation})
+_PUNCT_SET: Final = frozenset(string.punctuation)
+
+# Any other non-word character (emoji, Unicode punctuation) becomes a space
+_NON_WORD: Final = re.compile(r'[^\w\s]')
+
+
+class _ReadOnlyDict(dict):
+    """
+    A dict that rejects mutation, for song records shared between callers
+    Still a dict subclass, so orjson and json serialize it unchanged.
+    """
+    
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is read-only; copy it with dict() to modify")
+    
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+def _intern_keywords(table):
+    """
+    Intern every keyword so all matcher tables share one copy of each string
+    """
+    return {
+        emotion: {tier: [sys.intern(keyword) for keyword in keywords]
+                  for tier, keywords in keyword_sets.items()}
+        for emotion, keyword_sets in table.items()
+    }
+
+
+# Emotion -> keyword tier -> keywords, built once per process
+EMOTION_KEYWORDS: Final = _intern_keywords({
+    'happy': {
+        'primary': ['happy', 'joy', 'excited', 'great', 'amazing', 'wonderful', 'cheerful', 'delighted'],
+        'secondary': ['good', 'nice', 'pleased', 'satisfied', 'content', 'upbeat'],
+        'intensity': ['ecstatic', 'thrilled', 'overjoyed', 'euphoric']
+    },
+    'sad': {
+        'primary': ['sad', 'depressed', 'down', 'lonely', 'heartbroken', 'melancholy', 'miserable'],
+        'secondary': ['blue', 'gloomy', 'disappointed', 'hurt', 'upset'],
+        'intensity': ['devastated', 'crushed', 'despondent', 'hopeless']
+    },
+    'energetic': {
+        'primary': ['energetic', 'pumped', 'hyper', 'motivated', 'active', 'powerful'],
+        'secondary': ['workout', 'exercise', 'run', 'dance', 'move'],
+        'intensity': ['explosive', 'unstoppable', 'charged', 'electrified']
+    },
+    'calm': {
+        'primary': ['calm', 'peaceful', 'relax', 'chill', 'tranquil', 'serene'],
+        'secondary': ['meditate', 'zen', 'quiet', 'still', 'composed'],
+        'intensity': ['blissful', 'centered', 'harmonious']
+    },
+    'romantic': {
+        'primary': ['love', 'romantic', 'crush', 'date', 'relationship', 'tender'],
+        'secondary': ['affection', 'caring', 'devoted', 'intimate'],
+        'intensity': ['passionate', 'smitten', 'infatuated', 'adoring']
+    },
+    'angry': {
+        'primary': ['angry', 'mad', 'furious', 'rage', 'frustrated', 'annoyed'],
+        'secondary': ['irritated', 'bothered', 'pissed', 'livid'],
+        'intensity': ['enraged', 'incensed', 'outraged', 'seething']
+    },
+    'anxious': {
+        'primary': ['anxious', 'nervous', 'worried', 'stressed', 'tense', 'overwhelmed'],
+        'secondary': ['uneasy', 'restless', 'concerned', 'troubled'],
+        'intensity': ['panicked', 'terrified', 'frantic', 'distressed']
+    },
+    'nostalgic': {
+        'primary': ['nostalgic', 'memories', 'remember', 'past', 'throwback', 'reminisce'],
+        'secondary': ['missing', 'longing', 'sentimental', 'wistful'],
+        'intensity': ['yearning', 'pining']
+    },
+    'confident': {
+        'primary': ['confident', 'powerful', 'strong', 'fierce', 'unstoppable', 'boss'],
+        'secondary': ['capable', 'determined', 'bold', 'assured'],
+        'intensity': ['invincible', 'dominant', 'fearless', 'triumphant']
+    }
+})
+
+# Score added for each matched keyword, per tier
+TIER_WEIGHTS: Final = {'primary': 3, 'secondary': 1, 'intensity': 5}
 
 
 class MoodDetector:
@@ -17,89 +119,138 @@ class MoodDetector:
     """
     
     def __init__(self):
-        self.emotion_keywords = {
-            'happy': {
-                'primary': ['happy', 'joy', 'excited', 'great', 'amazing', 'wonderful', 'cheerful', 'delighted'],
-                'secondary': ['good', 'nice', 'pleased', 'satisfied', 'content', 'upbeat'],
-                'intensity': ['ecstatic', 'thrilled', 'overjoyed', 'euphoric']
-            },
-            'sad': {
-                'primary': ['sad', 'depressed', 'down', 'lonely', 'heartbroken', 'melancholy', 'miserable'],
-                'secondary': ['blue', 'gloomy', 'disappointed', 'hurt', 'upset'],
-                'intensity': ['devastated', 'crushed', 'despondent', 'hopeless']
-            },
-            'energetic': {
-                'primary': ['energetic', 'pumped', 'hyper', 'motivated', 'active', 'powerful'],
-                'secondary': ['workout', 'exercise', 'run', 'dance', 'move'],
-                'intensity': ['explosive', 'unstoppable', 'charged', 'electrified']
-            },
-            'calm': {
-                'primary': ['calm', 'peaceful', 'relax', 'chill', 'tranquil', 'serene'],
-                'secondary': ['meditate', 'zen', 'quiet', 'still', 'composed'],
-                'intensity': ['blissful', 'centered', 'harmonious']
-            },
-            'romantic': {
-                'primary': ['love', 'romantic', 'crush', 'date', 'relationship', 'tender'],
-                'secondary': ['affection', 'caring', 'devoted', 'intimate'],
-                'intensity': ['passionate', 'smitten', 'infatuated', 'adoring']
-            },
-            'angry': {
-                'primary': ['angry', 'mad', 'furious', 'rage', 'frustrated', 'annoyed'],
-                'secondary': ['irritated', 'bothered', 'pissed', 'livid'],
-                'intensity': ['enraged', 'incensed', 'outraged', 'seething']
-            },
-            'anxious': {
-                'primary': ['anxious', 'nervous', 'worried', 'stressed', 'tense', 'overwhelmed'],
-                'secondary': ['uneasy', 'restless', 'concerned', 'troubled'],
-                'intensity': ['panicked', 'terrified', 'frantic', 'distressed']
-            },
-            'nostalgic': {
-                'primary': ['nostalgic', 'memories', 'remember', 'past', 'throwback', 'reminisce'],
-                'secondary': ['missing', 'longing', 'sentimental', 'wistful'],
-                'intensity': ['yearning', 'pining']
-            },
-            'confident': {
-                'primary': ['confident', 'powerful', 'strong', 'fierce', 'unstoppable', 'boss'],
-                'secondary': ['capable', 'determined', 'bold', 'assured'],
-                'intensity': ['invincible', 'dominant', 'fearless', 'triumphant']
-            }
-        }
+        self.emotion_keywords = EMOTION_KEYWORDS
+        self.tier_weights = TIER_WEIGHTS
+        
+        # Scores are accumulated in a list indexed by emotion position
+        self._emotions = tuple(self.emotion_keywords)
+        self._emotion_index = {emotion: i for i, emotion in enumerate(self._emotions)}
+        
+        # Pick the fastest available keyword matcher
+        self._ac = self._native = self._token_sets = None
+        if ahocorasick:
+            self._ac = self._build_automaton()
+        elif _mood_native:
+            self._native = self._build_native_table()
+        else:
+            self._token_sets = self._build_token_sets()
+    
+    def _build_automaton(self):
+        """
+        Flatten every (emotion, tier, keyword) into a single Aho-Corasick
+        automaton so the text is scanned once instead of once per keyword.
+        Keywords are padded with spaces so that only whole words match.
+        """
+        payloads = {}
+        for emotion, keyword_sets in self.emotion_keywords.items():
+            for tier, weight in self.tier_weights.items():
+                for keyword in keyword_sets[tier]:
+                    payloads.setdefault(keyword, []).append((self._emotion_index[emotion], weight))
+        
+        automaton = ahocorasick.Automaton()
+        for keyword, hits in payloads.items():
+            automaton.add_word(f' {keyword} ', (keyword, tuple(hits)))
+        automaton.make_automaton()
+        return automaton
+    
+    def _build_native_table(self):
+        """
+        Pack padded keywords into one contiguous buffer plus parallel int
+        arrays (offset, length, emotion index, weight) for _mood_native.score
+        """
+        buf = bytearray()
+        offsets, lengths, emotion_ids, weights = (array.array('i') for _ in range(4))
+        for emotion_id, keyword_sets in enumerate(self.emotion_keywords.values()):
+            for tier, weight in self.tier_weights.items():
+                for keyword in keyword_sets[tier]:
+                    encoded = f' {keyword} '.encode('utf-8')
+                    offsets.append(len(buf))
+                    lengths.append(len(encoded))
+                    emotion_ids.append(emotion_id)
+                    weights.append(weight)
+                    buf += encoded
+        return bytes(buf), offsets, lengths, emotion_ids, weights
+    
+    def _build_token_sets(self):
+        """
+        Pure-Python fallback when no accelerator is available: a frozenset
+        of keywords per emotion tier, intersected with the text's tokens.
+        Every keyword is a single word, so this gives the same whole-word
+        matches as the padded automaton keywords.
+        """
+        return [
+            [(frozenset(keyword_sets[tier]), weight) for tier, weight in self.tier_weights.items()]
+            for keyword_sets in self.emotion_keywords.values()
+        ]
     
     def detect_emotion(self, text: str) -> Dict[str, any]:
         """
         Detect emotion from text input using multi-level keyword matching
         Returns emotion type, confidence score, and intensity
         """
+        return self._summarize(self._score(self._normalize(text)))
+    
+    def _normalize(self, text: str) -> str:
+        """
+        Lowercase, strip punctuation and pad with single spaces so keywords
+        only match whole words
+        """
+        # Remove punctuation for better matching (skipped when there is none)
         text_lower = text.lower()
+        if not text_lower.isascii():
+            text_clean = _NON_WORD.sub(' ', text_lower)
+        elif _PUNCT_SET.isdisjoint(text_lower):
+            text_clean = text_lower
+        else:
+            text_clean = text_lower.translate(_PUNCT_TABLE)
         
-        # Remove punctuation for better matching
-        text_clean = re.sub(r'[^\w\s]', ' ', text_lower)
+        return f" {' '.join(text_clean.split())} "
+    
+    def _score(self, text_padded: str) -> List[int]:
+        """
+        Per-emotion keyword scores for normalized text, in emotion order
+        """
+        if self._ac is not None:
+            # One pass over the text; each keyword counts once
+            return self._accumulate({payload for _, payload in self._ac.iter(text_padded)})
         
-        scores = {}
+        if self._native is not None:
+            # Compiled memmem scorer from _mood_native.pyx
+            return _mood_native.score(
+                text_padded.encode('utf-8'), *self._native, len(self._emotions)
+            )
         
-        # Calculate scores for each emotion
-        for emotion, keyword_sets in self.emotion_keywords.items():
-            score = 0
-            
-            # Primary keywords (weight: 3)
-            for keyword in keyword_sets['primary']:
-                if keyword in text_clean:
-                    score += 3
-            
-            # Secondary keywords (weight: 1)
-            for keyword in keyword_sets['secondary']:
-                if keyword in text_clean:
-                    score += 1
-            
-            # Intensity keywords (weight: 5)
-            for keyword in keyword_sets['intensity']:
-                if keyword in text_clean:
-                    score += 5
-            
-            scores[emotion] = score
+        # No accelerator installed, intersect the text's tokens with each tier
+        tokens = set(text_padded.split())
+        return [
+            sum(weight * len(tokens & keywords) for keywords, weight in tiers)
+            for tiers in self._token_sets
+        ]
+    
+    def _accumulate(self, matched) -> List[int]:
+        """
+        Sum the weights of matched automaton payloads per emotion
+        """
+        scores = [0] * len(self._emotions)
+        for _, hits in matched:
+            for emotion_id, weight in hits:
+                scores[emotion_id] += weight
+        return scores
+    
+    def _summarize(self, scores: List[int]) -> Dict[str, any]:
+        """
+        Turn per-emotion scores into the detect_emotion result
+        """
+        # Find dominant emotion and total score in a single pass
+        max_id, max_score, total_score = 0, 0, 0
+        for emotion_id, score in enumerate(scores):
+            total_score += score
+            if score > max_score:
+                max_id, max_score = emotion_id, score
+        
+        scores = dict(zip(self._emotions, scores))
         
-        # Find dominant emotion
-        if not any(scores.values()):
+        if max_score <= 0:
             return {
                 'emotion': 'calm',
                 'confidence': 0.5,
@@ -107,10 +258,6 @@ class MoodDetector:
                 'all_scores': scores
             }
         
-        max_emotion = max(scores, key=scores.get)
-        max_score = scores[max_emotion]
-        total_score = sum(scores.values())
-        
         # Calculate confidence (0-1)
         confidence = min(max_score / (total_score + 1), 1.0)
         
@@ -123,7 +270,7 @@ class MoodDetector:
             intensity = 'low'
         
         return {
-            'emotion': max_emotion,
+            'emotion': self._emotions[max_id],
             'confidence': round(confidence, 2),
             'intensity': intensity,
             'all_scores': scores
@@ -135,6 +282,9 @@ class MusicRecommender:
     Music recommendation engine that maps moods to songs
     """
     
+    # Largest limit served from the precomputed slices
+    MAX_LIMIT = 20
+    
     def __init__(self):
         self.song_database = {
             'happy': [
@@ -561,19 +711,64 @@ class MusicRecommender:
                 }
             ]
         }
+        
+        # Songs are shared by every caller and cache entry, so freeze them
+        self.song_database = {
+            mood: tuple(_ReadOnlyDict(song, tags=tuple(song['tags'])) for song in songs)
+            for mood, songs in self.song_database.items()
+        }
+        
+        # The database is static, so precompute every slice handed out
+        self._all_moods = tuple(self.song_database)
+        self._sliced = {
+            (mood, n): tuple(songs[:n])
+            for mood, songs in self.song_database.items()
+            for n in range(1, self.MAX_LIMIT + 1)
+        }
+        self._json_bytes = {
+            key: self._encode(key[0], songs) for key, songs in self._sliced.items()
+        }
+    
+    @staticmethod
+    def _encode(mood: str, songs) -> bytes:
+        """
+        Serialize a /recommend/<mood> response body
+        """
+        payload = {'mood': mood, 'recommendations': list(songs)}
+        return json.dumps(payload, separators=(',', ':'), sort_keys=True).encode('utf-8')
     
-    def get_recommendations(self, mood: str, limit: int = 5) -> List[Dict]:
+    def get_recommendations(self, mood: str, limit: int = 5) -> Tuple[Dict, ...]:
         """
         Get song recommendations based on detected mood
+        The returned tuple and song records are shared and read-only
         """
-        songs = self.song_database.get(mood, self.song_database['calm'])
-        return songs[:limit]
+        if mood not in self.song_database:
+            mood = 'calm'
+        
+        try:
+            return self._sliced[(mood, limit)]
+        except KeyError:
+            # Limit outside the precomputed range
+            return tuple(self.song_database[mood][:limit])
     
-    def get_all_moods(self) -> List[str]:
+    def get_recommendations_bytes(self, mood: str, limit: int = 5) -> bytes:
+        """
+        Get recommendations as a pre-serialized JSON body:
+        {"mood": ..., "recommendations": [...]}
+        """
+        if mood not in self.song_database:
+            mood = 'calm'
+        
+        try:
+            return self._json_bytes[(mood, limit)]
+        except KeyError:
+            return self._encode(mood, self.get_recommendations(mood, limit))
+    
+    def get_all_moods(self) -> Tuple[str, ...]:
         """
         Get list of all available moods
         """
-        return list(self.song_database.keys())
+        return self._all_moods
 
 
 class MoodTuneAPI:
@@ -581,13 +776,54 @@ class MoodTuneAPI:
     Main API interface for the MoodTune system
     """
     
-    def __init__(self):
+    # Longer texts are analyzed but not cached, bounding cache memory
+    MAX_CACHED_TEXT_LENGTH = 1000
+    
+    def __init__(self, cache_size: int = 2048):
         self.mood_detector = MoodDetector()
         self.recommender = MusicRecommender()
+        
+        # Exact-match cache so repeated queries skip the whole pipeline
+        self._cache_size = cache_size
+        self.reset_cache()
     
     def analyze_and_recommend(self, user_text: str, num_songs: int = 5) -> Dict:
         """
         Full pipeline: detect mood and get recommendations
+        Results are cached per (user_text, num_songs) as immutable snapshots;
+        each call only rebuilds the outer dict and the emotion_scores dict
+        """
+        if len(user_text) <= self.MAX_CACHED_TEXT_LENGTH:
+            snapshot = self._cache(user_text, num_songs)
+        else:
+            snapshot = self._analyze_impl(user_text, num_songs)
+        emotion, confidence, intensity, recommendations, scores = snapshot
+        return {
+            'user_input': user_text,
+            'detected_mood': emotion,
+            'confidence': confidence,
+            'intensity': intensity,
+            'recommendations': recommendations,
+            'emotion_scores': dict(scores)
+        }
+    
+    def reset_cache(self):
+        """
+        Replace the analysis cache with a fresh, empty one
+        Called after fork so worker processes never share cache state
+        """
+        self._cache = functools.lru_cache(maxsize=self._cache_size)(self._analyze_impl)
+    
+    def cache_info(self) -> Dict[str, int]:
+        """
+        Get hit/miss statistics for the analysis cache
+        """
+        return self._cache.cache_info()._asdict()
+    
+    def _analyze_impl(self, user_text: str, num_songs: int) -> Tuple:
+        """
+        Uncached pipeline behind analyze_and_recommend, returning
+        (emotion, confidence, intensity, recommendations, score items)
         """
         # Detect emotion
         emotion_result = self.mood_detector.detect_emotion(user_text)
@@ -598,14 +834,13 @@ class MoodTuneAPI:
             limit=num_songs
         )
         
-        return {
-            'user_input': user_text,
-            'detected_mood': emotion_result['emotion'],
-            'confidence': emotion_result['confidence'],
-            'intensity': emotion_result['intensity'],
-            'recommendations': recommendations,
-            'emotion_scores': emotion_result['all_scores']
-        }
+        return (
+            emotion_result['emotion'],
+            emotion_result['confidence'],
+            emotion_result['intensity'],
+            recommendations,
+            tuple(emotion_result['all_scores'].items())
+        )
 
 
 # Example usage
@@ -0,0 +1,26 @@
+"""
+Gunicorn configuration for MoodTune
+Usage: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import os
+
+bind = os.getenv('MOODTUNE_BIND', '0.0.0.0:5001')
+
+# One process per core (plus headroom), each running gevent greenlets
+workers = int(os.getenv('MOODTUNE_WORKERS', 2 * (os.cpu_count() or 1) + 1))
+worker_class = 'gevent'
+worker_connections = 1000
+
+# Build MoodTuneAPI once in the master; workers share it copy-on-write
+preload_app = True
+
+
+def post_fork(server, worker):
+    """
+    Give each worker its own analysis cache rather than the master's copy,
+    and restart the logging listener thread, which fork does not carry over
+    """
+    import api_server
+    api_server.moodtune.reset_cache()
+    api_server.configure_logging()
@@ -4,9 +4,164 @@ Fetches real song data from Spotify based on detected mood
 """
 
 import os
-from typing import List, Dict, Optional
-import requests
+from typing import Any, List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import asdict, dataclass, replace
+from functools import cached_property
+import asyncio
+import logging
+import operator
+import threading
+import time
+import httpx
+import orjson
 import base64
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Cap on in-flight requests for batched async fetches
+MAX_CONCURRENT_REQUESTS = 10
+
+# How long successful responses are reused, in seconds
+CACHE_TTL = 600
+
+# Spotify's largest accepted limit per endpoint
+MAX_RECOMMENDATIONS_LIMIT = 100
+MAX_SEARCH_LIMIT = 50
+
+# Most track IDs accepted by one /audio-features call
+AUDIO_FEATURES_BATCH_SIZE = 100
+
+# HTTP/2 connection pool and timeout (seconds) for Spotify requests
+HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+REQUEST_TIMEOUT = 10.0
+
+# Retries for rate limiting (429) and transient server errors
+MAX_RETRIES = 5
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+BACKOFF_FACTOR = 0.5
+# Longest Retry-After (seconds) worth waiting for; longer waits fail fast
+MAX_RETRY_AFTER = 5.0
+
+# Default budget, in seconds, for a sync Spotify recommendation fetch
+# before the curated fallback is returned instead. Authentication happens
+# before the budget starts; retries and their sleeps count against it.
+SPOTIFY_DEADLINE = 0.8
+
+# Errors that fall back to mock data instead of propagating: transport
+# failures, and malformed payloads (missing keys, nulls, wrong types)
+SPOTIFY_ERRORS = (httpx.HTTPError, KeyError, ValueError, TypeError, AttributeError)
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> Optional[float]:
+    """
+    Seconds to wait before retrying a response, or None if it is final.
+    429s honour Retry-After up to MAX_RETRY_AFTER, beyond which the 429 is
+    final; other retryable errors back off exponentially.
+    """
+    if response.status_code not in RETRY_STATUSES or attempt >= MAX_RETRIES:
+        return None
+    
+    backoff = BACKOFF_FACTOR * 2 ** attempt
+    if response.status_code != 429:
+        return backoff
+    try:
+        delay = max(float(response.headers.get('Retry-After', backoff)), 0)
+    except ValueError:
+        return backoff
+    return delay if delay <= MAX_RETRY_AFTER else None
+
+
+@dataclass(frozen=True)
+class Track:
+    """
+    A recommended or searched song
+
+    Slotted and immutable so cached responses stay small and can be
+    shared between callers. Use to_dict() at the JSON boundary.
+    """
+    __slots__ = (
+        'id', 'title', 'artist', 'album', 'year', 'preview_url', 'spotify_url',
+        'album_art', 'duration_ms', 'popularity', 'energy', 'valence'
+    )
+    
+    id: Optional[str]
+    title: str
+    artist: str
+    album: str
+    year: str
+    preview_url: Optional[str]
+    spotify_url: Optional[str]
+    album_art: Optional[str]
+    duration_ms: Optional[int]
+    popularity: Optional[int]
+    energy: Optional[float]
+    valence: Optional[float]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Song dictionary for JSON serialization
+        """
+        return asdict(self)
+    
+    # Slots without a __dict__ need explicit state, and restoring it has to
+    # bypass the frozen __setattr__, for pickle and copy to work
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+    
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+
+# Fields of a Spotify track object used by _format_track
+_track_fields = operator.itemgetter(
+    'id', 'name', 'album', 'artists', 'external_urls', 'duration_ms', 'popularity'
+)
+
+
+def _format_track(track: Dict) -> Track:
+    """
+    Convert a Spotify track object into a Track
+    """
+    track_id, name, album, artists, urls, duration_ms, popularity = _track_fields(track)
+    release_date = album.get('release_date')
+    images = album['images']
+    return Track(
+        id=track_id,
+        title=name,
+        artist=', '.join(artist['name'] for artist in artists),
+        album=album['name'],
+        year=release_date[:4] if release_date else 'N/A',
+        preview_url=track.get('preview_url'),
+        spotify_url=urls['spotify'],
+        album_art=images[0]['url'] if images else None,
+        duration_ms=duration_ms,
+        popularity=popularity,
+        energy=None,
+        valence=None
+    )
+
+
+def _curated_track(song: Dict) -> Track:
+    """
+    Convert a song from the curated database into a Track
+    """
+    return Track(
+        id=None,
+        title=song['title'],
+        artist=song['artist'],
+        album=song.get('album', 'N/A'),
+        year=str(song['year']),
+        preview_url=None,
+        spotify_url=None,
+        album_art=None,
+        duration_ms=None,
+        popularity=None,
+        energy=song.get('energy'),
+        valence=song.get('valence')
+    )
 
 
 class SpotifyAPI:
@@ -14,20 +169,57 @@ class SpotifyAPI:
     Spotify API client for fetching song recommendations
     """
     
-    def __init__(self, client_id: Optional[str] = None, client_secret: Optional[str] = None):
+    def __init__(self, client_id: Optional[str] = None, client_secret: Optional[str] = None,
+                 deadline: Optional[float] = SPOTIFY_DEADLINE):
         """
         Initialize Spotify API client
         
         Args:
             client_id: Spotify API client ID (from environment or parameter)
             client_secret: Spotify API client secret (from environment or parameter)
+            deadline: Seconds get_recommendations waits for Spotify before
+                returning mock data, or None to always wait for the fetch
         """
         self.client_id = client_id or os.getenv('SPOTIFY_CLIENT_ID')
         self.client_secret = client_secret or os.getenv('SPOTIFY_CLIENT_SECRET')
         self.access_token = None
+        self.token_expiry = 0.0
+        self.deadline = deadline
+        
+        # Without credentials every call is served from the curated database
+        self._disabled = not (self.client_id and self.client_secret)
+        if self._disabled:
+            logger.warning("Spotify credentials not provided. Using mock data.")
+        
+        # Basic auth header for the token endpoint, encoded once
+        self._basic_auth = None
+        if not self._disabled:
+            credentials = f"{self.client_id}:{self.client_secret}".encode('utf-8')
+            self._basic_auth = f"Basic {base64.b64encode(credentials).decode('utf-8')}"
         self.token_url = 'https://accounts.spotify.com/api/token'
         self.api_base_url = 'https://api.spotify.com/v1'
         
+        # One HTTP/2 client for every sync call; requests to a host are
+        # multiplexed over a single TLS connection
+        self.session = httpx.Client(
+            transport=httpx.HTTPTransport(http2=True, limits=HTTP_LIMITS, retries=3),
+            timeout=REQUEST_TIMEOUT
+        )
+        
+        # Successful responses keyed on (mood, limit) and (query, limit), stored
+        # as tuples of frozen Tracks so handing them out shares no mutable state
+        self._rec_cache = TTLCache(maxsize=256, ttl=CACHE_TTL)
+        self._search_cache = TTLCache(maxsize=256, ttl=CACHE_TTL)
+        # Guards both caches and _pending; worker threads write to them
+        self._cache_lock = threading.Lock()
+        
+        # Workers for deadline-bound fetches; one that misses the deadline
+        # keeps running and caches its result for later calls
+        self._exec = ThreadPoolExecutor(max_workers=4, thread_name_prefix='spotify')
+        # In-flight fetch and its deadline per (mood, limit), shared by every
+        # caller that misses the cache while it runs
+        self._pending = {}
+        
         # Mood to Spotify audio features mapping
         self.mood_features = {
             'happy': {
@@ -76,6 +268,29 @@ class SpotifyAPI:
                 'seed_genres': ['hip-hop', 'rap', 'power']
             }
         }
+        
+        # /recommendations query params per mood, built once
+        self._mood_query = {
+            mood: {
+                'seed_genres': ','.join(features['seed_genres'][:2]),
+                'target_valence': features['target_valence'],
+                'target_energy': features['target_energy']
+            }
+            for mood, features in self.mood_features.items()
+        }
+    
+    def close(self):
+        """
+        Stop the fetch workers and close the pooled HTTP client
+        """
+        self._exec.shutdown(wait=True)
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def authenticate(self) -> bool:
         """
@@ -84,38 +299,72 @@ class SpotifyAPI:
         Returns:
             bool: True if authentication successful, False otherwise
         """
-        if not self.client_id or not self.client_secret:
-            print("Warning: Spotify credentials not provided. Using mock data.")
+        if self._disabled:
             return False
         
         try:
-            # Encode credentials
-            auth_string = f"{self.client_id}:{self.client_secret}"
-            auth_bytes = auth_string.encode('utf-8')
-            auth_base64 = base64.b64encode(auth_bytes).decode('utf-8')
-            
-            # Request token
-            headers = {
-                'Authorization': f'Basic {auth_base64}',
-                'Content-Type': 'application/x-www-form-urlencoded'
-            }
-            
-            data = {'grant_type': 'client_credentials'}
-            
-            response = requests.post(self.token_url, headers=headers, data=data)
-            response.raise_for_status()
-            
-            token_data = response.json()
-            self.access_token = token_data['access_token']
+            response = self._request('POST', self.token_url, **self._token_request())
+            self._store_token(response)
+            return True
             
-            print("Successfully authenticated with Spotify API")
+        except SPOTIFY_ERRORS:
+            logger.exception("Spotify authentication failed")
+            return False
+    
+    async def authenticate_async(self, client: httpx.AsyncClient) -> bool:
+        """
+        Async version of authenticate, requesting the token on client
+        so the caller's event loop is never blocked
+        """
+        if self._disabled:
+            return False
+        
+        try:
+            response = await self._request_async(client, 'POST', self.token_url, **self._token_request())
+            self._store_token(response)
             return True
             
-        except Exception as e:
-            print(f"Spotify authentication failed: {str(e)}")
+        except SPOTIFY_ERRORS:
+            logger.exception("Spotify authentication failed")
             return False
     
-    def get_recommendations(self, mood: str, limit: int = 10) -> List[Dict]:
+    def _token_request(self) -> Dict:
+        """
+        Headers and form data for the client credentials token request
+        """
+        return {
+            'headers': {
+                'Authorization': self._basic_auth,
+                'Content-Type': 'application/x-www-form-urlencoded'
+            },
+            'data': {'grant_type': 'client_credentials'}
+        }
+    
+    def _store_token(self, response: httpx.Response):
+        """
+        Keep the access token from a token endpoint response
+        """
+        token_data = orjson.loads(response.content)
+        self.access_token = token_data['access_token']
+        # Refresh 30s early so a token never expires mid-request
+        self.token_expiry = time.monotonic() + token_data.get('expires_in', 3600) - 30
+        
+        logger.info("Successfully authenticated with Spotify API")
+    
+    def _has_token(self) -> bool:
+        """
+        Whether a valid access token is held
+        """
+        return bool(self.access_token) and time.monotonic() < self.token_expiry
+    
+    def _ensure_token(self) -> bool:
+        """
+        Make sure a valid access token is held, re-authenticating only
+        when there is none or it has expired
+        """
+        return self._has_token() or self.authenticate()
+    
+    def get_recommendations(self, mood: str, limit: int = 10) -> Tuple[Track, ...]:
         """
         Get song recommendations from Spotify based on mood
         
@@ -124,66 +373,266 @@ class SpotifyAPI:
             limit: Number of recommendations to return
         
         Returns:
-            List of song dictionaries
+            Tuple of Track objects (shared with the cache, so immutable)
         """
-        if not self.access_token:
-            if not self.authenticate():
-                return self._get_mock_recommendations(mood, limit)
+        # Requests Spotify would reject never leave the client
+        if limit <= 0:
+            return ()
+        limit = min(limit, MAX_RECOMMENDATIONS_LIMIT)
+        
+        if self._disabled:
+            return self._get_mock_recommendations(mood, limit)
+        
+        key = (mood, limit)
+        with self._cache_lock:
+            cached = self._rec_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        # Authenticate outside the deadline, so a cold start or token
+        # refresh does not push the fetch itself into the mock fallback
+        if not self._ensure_token():
+            return self._get_mock_recommendations(mood, limit)
+        
+        with self._cache_lock:
+            if key not in self._pending:
+                self._pending[key] = (
+                    self._exec.submit(self._fetch_recommendations, mood, limit),
+                    None if self.deadline is None else time.monotonic() + self.deadline
+                )
+            future, deadline = self._pending[key]
+        
+        # A fetch gets self.deadline seconds from when it started, however
+        # many callers wait on it; the fallback is built while it is in flight
+        mock = self._get_mock_recommendations(mood, limit)
         
         try:
-            mood_params = self.mood_features.get(mood, self.mood_features['calm'])
-            
-            # Build Spotify recommendations API request
-            endpoint = f"{self.api_base_url}/recommendations"
-            
-            params = {
-                'seed_genres': ','.join(mood_params['seed_genres'][:2]),
-                'target_valence': mood_params['target_valence'],
-                'target_energy': mood_params['target_energy'],
-                'limit': limit
-            }
-            
-            headers = {
-                'Authorization': f'Bearer {self.access_token}'
-            }
-            
-            response = requests.get(endpoint, headers=headers, params=params)
-            response.raise_for_status()
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            recommendations = future.result(timeout=timeout)
+        except FutureTimeout:
+            logger.warning("Spotify recommendations for %s exceeded %.1fs, using mock data",
+                           mood, self.deadline)
+            return mock
+        except SPOTIFY_ERRORS:
+            logger.exception("Error fetching Spotify recommendations for %s", mood)
+            return mock
+        
+        return mock if recommendations is None else recommendations
+    
+    def _fetch_recommendations(self, mood: str, limit: int) -> Optional[Tuple[Track, ...]]:
+        """
+        Fetch and cache one mood's recommendations, or None without a token
+        """
+        try:
+            if not self._ensure_token():
+                return None
             
-            data = response.json()
+            endpoint, params, headers = self._recommendations_request(mood, limit)
             
-            # Format response
-            recommendations = []
-            for track in data.get('tracks', []):
-                song = {
-                    'title': track['name'],
-                    'artist': ', '.join([artist['name'] for artist in track['artists']]),
-                    'album': track['album']['name'],
-                    'year': track['album']['release_date'][:4] if track['album'].get('release_date') else 'N/A',
-                    'preview_url': track.get('preview_url'),
-                    'spotify_url': track['external_urls']['spotify'],
-                    'album_art': track['album']['images'][0]['url'] if track['album']['images'] else None,
-                    'duration_ms': track['duration_ms'],
-                    'popularity': track['popularity']
-                }
-                recommendations.append(song)
+            response = self._get(endpoint, headers, params)
             
+            recommendations = self._format_recommendations(orjson.loads(response.content))
+            with self._cache_lock:
+                self._rec_cache[(mood, limit)] = recommendations
             return recommendations
+        finally:
+            with self._cache_lock:
+                self._pending.pop((mood, limit), None)
+    
+    def get_recommendations_many(self, moods: List[str], limit: int = 10) -> Dict[str, Tuple[Track, ...]]:
+        """
+        Get recommendations for several moods, fetched concurrently
+        
+        Args:
+            moods: Moods to fetch
+            limit: Number of recommendations per mood
+        
+        Returns:
+            Dict mapping each mood to its tuple of Track objects
+        """
+        return asyncio.run(self.get_recommendations_many_async(moods, limit))
+    
+    def get_recommendations_all_moods(self, limit: int = 10) -> Dict[str, Tuple[Track, ...]]:
+        """
+        Get recommendations for every mood, enriched with audio features
+        
+        Moods are fetched concurrently, then the audio features for all
+        returned tracks come from batched /audio-features calls (one per
+        AUDIO_FEATURES_BATCH_SIZE unique IDs) instead of one per mood.
+        
+        Args:
+            limit: Number of recommendations per mood
+        
+        Returns:
+            Dict mapping each mood to Tracks with energy and valence filled in
+        """
+        by_mood = self.get_recommendations_many(list(self.mood_features), limit)
+        
+        # Mock fallbacks have no Spotify ID and already carry audio features
+        track_ids = list(dict.fromkeys(
+            song.id for songs in by_mood.values() for song in songs if song.id
+        ))
+        if not track_ids or not self._ensure_token():
+            return by_mood
+        
+        try:
+            features = self._get_audio_features(track_ids)
+        except SPOTIFY_ERRORS:
+            logger.exception("Error fetching Spotify audio features")
+            return by_mood
+        
+        return {
+            mood: tuple(replace(song, **features[song.id]) if song.id in features else song for song in songs)
+            for mood, songs in by_mood.items()
+        }
+    
+    def _get_audio_features(self, track_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Fetch energy and valence for many tracks, keyed by track ID
+        """
+        endpoint = f"{self.api_base_url}/audio-features"
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        
+        features = {}
+        for start in range(0, len(track_ids), AUDIO_FEATURES_BATCH_SIZE):
+            batch = track_ids[start:start + AUDIO_FEATURES_BATCH_SIZE]
+            response = self._get(endpoint, headers, {'ids': ','.join(batch)})
+            for item in orjson.loads(response.content).get('audio_features', []):
+                # Unknown IDs come back as null
+                if item:
+                    features[item['id']] = {'energy': item['energy'], 'valence': item['valence']}
+        return features
+    
+    async def get_recommendations_many_async(self, moods: List[str], limit: int = 10) -> Dict[str, Tuple[Track, ...]]:
+        """
+        Async version of get_recommendations_many, for callers already
+        running an event loop. Requests are multiplexed over one HTTP/2
+        client and at most MAX_CONCURRENT_REQUESTS are in flight at once.
+        """
+        if limit <= 0:
+            return {mood: () for mood in moods}
+        limit = min(limit, MAX_RECOMMENDATIONS_LIMIT)
+        
+        if self._disabled:
+            return {mood: self._get_mock_recommendations(mood, limit) for mood in moods}
+        
+        recommendations = {}
+        with self._cache_lock:
+            for mood in moods:
+                if (mood, limit) in self._rec_cache:
+                    recommendations[mood] = self._rec_cache[(mood, limit)]
+        
+        missing = [mood for mood in dict.fromkeys(moods) if mood not in recommendations]
+        if not missing:
+            return recommendations
+        
+        semaphore = asyncio.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+        transport = httpx.AsyncHTTPTransport(http2=True, limits=HTTP_LIMITS, retries=3)
+        async with httpx.AsyncClient(transport=transport, timeout=REQUEST_TIMEOUT) as client:
+            if not (self._has_token() or await self.authenticate_async(client)):
+                recommendations.update(
+                    (mood, self._get_mock_recommendations(mood, limit)) for mood in missing
+                )
+                return {mood: recommendations[mood] for mood in moods}
             
-        except Exception as e:
-            print(f"Error fetching Spotify recommendations: {str(e)}")
-            return self._get_mock_recommendations(mood, limit)
+            results = await asyncio.gather(
+                *(self._fetch_recommendations_async(client, semaphore, mood, limit) for mood in missing),
+                return_exceptions=True
+            )
+        
+        for mood, result in zip(missing, results):
+            if isinstance(result, Exception):
+                logger.error("Error fetching Spotify recommendations for %s", mood, exc_info=result)
+                result = self._get_mock_recommendations(mood, limit)
+            else:
+                with self._cache_lock:
+                    self._rec_cache[(mood, limit)] = result
+            recommendations[mood] = result
+        return {mood: recommendations[mood] for mood in moods}
+    
+    async def _fetch_recommendations_async(self, client, semaphore, mood: str, limit: int) -> Tuple[Track, ...]:
+        """
+        Fetch and format one mood's recommendations on an httpx.AsyncClient
+        """
+        endpoint, params, headers = self._recommendations_request(mood, limit)
+        
+        async with semaphore:
+            response = await self._request_async(client, 'GET', endpoint, headers=headers, params=params)
+        
+        return self._format_recommendations(orjson.loads(response.content))
+    
+    async def _request_async(self, client, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Async version of _request on an httpx.AsyncClient
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            response = await client.request(method, url, **kwargs)
+            delay = _retry_delay(response, attempt)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+        
+        response.raise_for_status()
+        return response
+    
+    def _recommendations_request(self, mood: str, limit: int):
+        """
+        Build the endpoint, query params and headers for /recommendations
+        """
+        # Build Spotify recommendations API request
+        endpoint = f"{self.api_base_url}/recommendations"
+        
+        params = {**self._mood_query.get(mood, self._mood_query['calm']), 'limit': limit}
+        
+        headers = {
+            'Authorization': f'Bearer {self.access_token}'
+        }
+        
+        return endpoint, params, headers
+    
+    def _format_recommendations(self, data: Dict) -> Tuple[Track, ...]:
+        """
+        Convert a /recommendations response into Tracks
+        """
+        return tuple(_format_track(track) for track in data.get('tracks', []))
     
-    def _get_mock_recommendations(self, mood: str, limit: int) -> List[Dict]:
+    def _get(self, endpoint: str, headers: Dict, params: Dict) -> httpx.Response:
+        """
+        GET an API endpoint, see _request
+        """
+        return self._request('GET', endpoint, headers=headers, params=params)
+    
+    def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request, retrying 429 and transient 5xx responses up to
+        MAX_RETRIES times before raising for the final status
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            response = self.session.request(method, url, **kwargs)
+            delay = _retry_delay(response, attempt)
+            if delay is None:
+                break
+            time.sleep(delay)
+        
+        response.raise_for_status()
+        return response
+    
+    @cached_property
+    def _mock_recommender(self):
+        """
+        Curated-database recommender, built on first fallback and reused
+        """
+        from backend import MusicRecommender
+        return MusicRecommender()
+    
+    def _get_mock_recommendations(self, mood: str, limit: int) -> Tuple[Track, ...]:
         """
         Return mock recommendations when Spotify API is unavailable
         """
         # This would return the curated list from the database
-        from backend import MusicRecommender
-        recommender = MusicRecommender()
-        return recommender.get_recommendations(mood, limit)
+        return tuple(_curated_track(song) for song in self._mock_recommender.get_recommendations(mood, limit))
     
-    def search_track(self, query: str, limit: int = 5) -> List[Dict]:
+    def search_track(self, query: str, limit: int = 5) -> Tuple[Track, ...]:
         """
         Search for tracks on Spotify
         
@@ -192,11 +641,23 @@ class SpotifyAPI:
             limit: Number of results
         
         Returns:
-            List of track dictionaries
+            Tuple of Track objects
         """
-        if not self.access_token:
-            if not self.authenticate():
-                return []
+        if limit <= 0:
+            return ()
+        limit = min(limit, MAX_SEARCH_LIMIT)
+        
+        if self._disabled:
+            return ()
+        
+        key = (query, limit)
+        with self._cache_lock:
+            cached = self._search_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        if not self._ensure_token():
+            return ()
         
         try:
             endpoint = f"{self.api_base_url}/search"
@@ -211,28 +672,19 @@ class SpotifyAPI:
                 'Authorization': f'Bearer {self.access_token}'
             }
             
-            response = requests.get(endpoint, headers=headers, params=params)
-            response.raise_for_status()
+            response = self._get(endpoint, headers, params)
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
-            tracks = []
-            for track in data.get('tracks', {}).get('items', []):
-                track_info = {
-                    'title': track['name'],
-                    'artist': ', '.join([artist['name'] for artist in track['artists']]),
-                    'album': track['album']['name'],
-                    'spotify_url': track['external_urls']['spotify'],
-                    'preview_url': track.get('preview_url'),
-                    'popularity': track['popularity']
-                }
-                tracks.append(track_info)
+            tracks = tuple(_format_track(track) for track in data.get('tracks', {}).get('items', []))
             
+            with self._cache_lock:
+                self._search_cache[key] = tracks
             return tracks
             
-        except Exception as e:
-            print(f"Error searching Spotify: {str(e)}")
-            return []
+        except SPOTIFY_ERRORS:
+            logger.exception("Error searching Spotify for %r", query)
+            return ()
 
 
 # Setup instructions for Spotify API
@@ -257,7 +709,7 @@ To use Spotify API integration:
    export SPOTIFY_CLIENT_SECRET='your_client_secret_here'
 
 5. Install required package:
-   pip install requests --break-system-packages
+   pip install 'httpx[http2]' --break-system-packages
 
 Note: The system will work without Spotify API credentials using
 curated song database, but Spotify integration provides real-time
@@ -266,6 +718,8 @@ music data and preview URLs.
 
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    
     print("=" * 80)
     print("Spotify API Integration Test")
     print("=" * 80)
@@ -285,9 +739,9 @@ if __name__ == '__main__':
         print(f"\nTop 5 {mood} songs:")
         print("-" * 60)
         for i, song in enumerate(recommendations, 1):
-            print(f"{i}. {song['title']} - {song['artist']}")
-            if song.get('spotify_url'):
-                print(f"   Listen: {song['spotify_url']}")
+            print(f"{i}. {song.title} - {song.artist}")
+            if song.spotify_url:
+                print(f"   Listen: {song.spotify_url}")
         print()
     else:
         print("\n⚠ Spotify API not configured")
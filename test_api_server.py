@@ -0,0 +1,52 @@
+"""
+Tests for the Flask API server's streamed /analyze responses
+Run with: python -m unittest
+"""
+
+import unittest
+from unittest import mock
+
+import orjson
+
+import api_server
+
+
+class StreamedAnalyzeTest(unittest.TestCase):
+    """
+    The curated database has fewer songs per mood than _STREAM_MIN_SONGS,
+    so the threshold is lowered to force the streaming branch
+    """
+
+    def setUp(self):
+        self.client = api_server.app.test_client()
+
+    def _analyze(self, text, num_songs):
+        return self.client.post('/analyze', data=orjson.dumps({'text': text, 'num_songs': num_songs}))
+
+    def test_streamed_body_matches_orjson(self):
+        for text in ('so happy and excited', 'feeling sad and down', 'nothing in particular'):
+            expected = orjson.dumps(api_server.moodtune.analyze_and_recommend(text, 3))
+
+            with mock.patch.object(api_server, '_STREAM_MIN_SONGS', 0):
+                response = self._analyze(text, 3)
+
+            self.assertNotIn('Content-Length', response.headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.mimetype, 'application/json')
+            self.assertEqual(response.get_data(), expected)
+
+    def test_small_responses_are_not_streamed(self):
+        response = self._analyze('so happy and excited', 3)
+
+        self.assertEqual(int(response.headers['Content-Length']), len(response.get_data()))
+        self.assertEqual(response.get_data(),
+                         orjson.dumps(api_server.moodtune.analyze_and_recommend('so happy and excited', 3)))
+
+    def test_iter_json_handles_empty_and_nested_values(self):
+        obj = {'empty': [], 'songs': ({'tags': ('a', 'b')}, {'tags': ()}), 'scores': {'happy': 1}, 'ok': None}
+
+        self.assertEqual(b''.join(api_server._iter_json(obj)), orjson.dumps(obj))
+
+
+if __name__ == '__main__':
+    unittest.main()
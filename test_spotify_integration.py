@@ -0,0 +1,131 @@
+"""
+Tests for the deadline-bound sync path of SpotifyAPI.get_recommendations
+Spotify is replaced by an httpx.MockTransport; run with: python -m unittest
+"""
+
+import threading
+import time
+import unittest
+
+import httpx
+import orjson
+
+from spotify_integration import SpotifyAPI
+
+
+def _track(track_id):
+    return {
+        'id': track_id,
+        'name': f'Song {track_id}',
+        'album': {'name': 'Album', 'release_date': '2001-01-01', 'images': []},
+        'artists': [{'name': 'Artist'}],
+        'external_urls': {'spotify': f'https://open.spotify.com/track/{track_id}'},
+        'duration_ms': 1000,
+        'popularity': 50
+    }
+
+
+class FakeSpotify:
+    """
+    MockTransport handler: token and /recommendations endpoints whose
+    recommendation responses can be stalled or rate limited
+    """
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.release.set()
+        self.token_delay = 0.0
+        self.rate_limited = 0
+        self.recommendation_calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, request):
+        if request.url.path.endswith('/token'):
+            time.sleep(self.token_delay)
+            return httpx.Response(200, content=orjson.dumps({'access_token': 'token', 'expires_in': 3600}))
+
+        with self.lock:
+            self.recommendation_calls += 1
+            if self.rate_limited:
+                self.rate_limited -= 1
+                return httpx.Response(429, headers={'Retry-After': '0'})
+
+        self.release.wait(5)
+        return httpx.Response(200, content=orjson.dumps({'tracks': [_track('a'), _track('b')]}))
+
+
+class DeadlineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.spotify = FakeSpotify()
+        self.api = SpotifyAPI('id', 'secret', deadline=0.2)
+        self.api.session.close()
+        self.api.session = httpx.Client(transport=httpx.MockTransport(self.spotify))
+
+    def tearDown(self):
+        self.spotify.release.set()
+        self.api.close()
+
+    def _wait_for_fetches(self):
+        with self.api._cache_lock:
+            futures = [future for future, _ in self.api._pending.values()]
+        for future in futures:
+            future.result(timeout=5)
+
+    def test_returns_spotify_tracks_within_deadline(self):
+        songs = self.api.get_recommendations('happy', 2)
+
+        self.assertEqual([song.id for song in songs], ['a', 'b'])
+
+    def test_timeout_falls_back_to_mock(self):
+        self.spotify.release.clear()
+
+        songs = self.api.get_recommendations('happy', 2)
+
+        self.assertEqual(songs, self.api._get_mock_recommendations('happy', 2))
+
+    def test_late_fetch_is_cached(self):
+        self.spotify.release.clear()
+        self.api.get_recommendations('happy', 2)
+        self.spotify.release.set()
+        self._wait_for_fetches()
+
+        songs = self.api.get_recommendations('happy', 2)
+
+        self.assertEqual([song.id for song in songs], ['a', 'b'])
+        self.assertEqual(self.spotify.recommendation_calls, 1)
+
+    def test_in_flight_fetch_is_shared(self):
+        self.spotify.release.clear()
+        self.api.authenticate()
+
+        callers = [threading.Thread(target=self.api.get_recommendations, args=('happy', 2)) for _ in range(8)]
+        for caller in callers:
+            caller.start()
+        for caller in callers:
+            caller.join()
+
+        self.assertEqual(self.spotify.recommendation_calls, 1)
+        self.assertEqual(len(self.api._pending), 1)
+        self.spotify.release.set()
+        self._wait_for_fetches()
+        self.assertEqual(self.api._pending, {})
+
+    def test_rate_limit_is_retried(self):
+        self.spotify.rate_limited = 1
+
+        songs = self.api.get_recommendations('happy', 2)
+
+        self.assertEqual([song.id for song in songs], ['a', 'b'])
+        self.assertEqual(self.spotify.recommendation_calls, 2)
+
+    def test_authentication_is_outside_deadline(self):
+        self.spotify.token_delay = 0.4
+
+        songs = self.api.get_recommendations('happy', 2)
+
+        self.assertEqual([song.id for song in songs], ['a', 'b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
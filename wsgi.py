@@ -0,0 +1,12 @@
+"""
+WSGI entrypoint for MoodTune
+Patches the standard library for gevent before the Flask app is imported
+
+Run with: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+from api_server import app  # noqa: E402